@@ -1 +1,8 @@
-from .static import *
+# Names resolve lazily through static (and static.libs)
+import importlib
+
+def __getattr__(name):
+  if name.startswith("__") and name != "__all__":
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  module = importlib.import_module(".static", __name__)
+  return module if name == "static" else getattr(module, name)
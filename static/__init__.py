@@ -1 +1,8 @@
-from .libs import *
+# Names resolve lazily through static.libs
+import importlib
+
+def __getattr__(name):
+  if name.startswith("__") and name != "__all__":
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  module = importlib.import_module(".libs", __name__)
+  return module if name == "libs" else getattr(module, name)
@@ -1,2 +1,26 @@
-from .converters import *
-from .web_indexer import *
+# Submodules and their public names load on first access, so that importing the
+# package (or a single tool) does not pull every tool's dependencies
+import importlib
+
+_SUBMODULES = ("converters", "web_indexer") # re-exported, as star imports did
+_TOOLS = ("builder", "snapshot", "endpoints_status", "endpoints_bench", "import_budget")
+
+def _public_names():
+  names = []
+  for submodule in _SUBMODULES:
+    module = importlib.import_module(f".{submodule}", __name__)
+    names += [n for n in vars(module) if not n.startswith("_") and n not in names]
+  return names
+
+def __getattr__(name):
+  if name == "__all__": # computed on star imports only
+    return _public_names()
+  if name.startswith("__"):
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  if name in _SUBMODULES or name in _TOOLS:
+    return importlib.import_module(f".{name}", __name__)
+  for submodule in _SUBMODULES:
+    module = importlib.import_module(f".{submodule}", __name__)
+    if not name.startswith("_") and hasattr(module, name):
+      return getattr(module, name)
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+
+from . import converters, web_indexer
+
+DEFAULT_STATE_PATH = ".build-state.json"
+
+@dataclass
+class Task:
+  name: str
+  stage: str
+  run: Callable[[], object]
+  inputs: List[str] = field(default_factory=list)
+  outputs: List[str] = field(default_factory=list)
+  deps: List[str] = field(default_factory=list)
+  signature: Optional[Callable[[], str]] = None # defaults to the stats of inputs
+
+@dataclass
+class TaskRun:
+  name: str
+  stage: str
+  status: str # ran, skipped or failed
+  wall_s: float = 0
+  cpu_s: float = 0
+  start: float = 0
+  end: float = 0
+  error: Optional[str] = None
+  profile: Optional[object] = None # cProfile.Profile
+
+def file_signature(paths):
+  """mtime and size of files, so that touched or rewritten inputs invalidate their tasks."""
+  sig = []
+  for path in paths:
+    try:
+      stat = os.stat(path)
+      sig.append([path, stat.st_mtime_ns, stat.st_size])
+    except OSError:
+      sig.append([path, None, None])
+  return json.dumps(sig)
+
+def dir_signature(path, ignored=("index.html",)):
+  """Directory listing with file stats (subdirectory names only), as rendered by the index."""
+  entries = []
+  for entry in sorted(os.scandir(path), key=lambda e: e.name):
+    if entry.name in ignored:
+      continue
+    if entry.is_dir():
+      entries.append([entry.name])
+    else:
+      stat = entry.stat()
+      entries.append([entry.name, stat.st_mtime_ns, stat.st_size])
+  return json.dumps(entries)
+
+class Builder:
+  """Runs file-level tasks as a DAG, skipping tasks whose inputs and upstream tasks did not change."""
+
+  def __init__(self, state_path=DEFAULT_STATE_PATH, jobs=os.cpu_count(), force=False, cprofile=False):
+    self.tasks: Dict[str, Task] = {}
+    self.state_path = Path(state_path)
+    self.jobs = 1 if cprofile else max(1, jobs or 1) # a single profiler can be active at once on 3.12+
+    self.force = force
+    self.cprofile = cprofile
+    self.runs: Dict[str, TaskRun] = {}
+    self.state = {}
+    if self.state_path.exists() and not force:
+      with open(self.state_path, "r") as f:
+        self.state = json.load(f)
+
+  def add(self, task: Task):
+    if task.name in self.tasks:
+      raise ValueError(f"Duplicate task: {task.name}")
+    self.tasks[task.name] = task
+    return task
+
+  def resolve_deps(self):
+    """Adds implicit dependencies from tasks producing other tasks' inputs, and checks for cycles."""
+    producers = {output: task.name for task in self.tasks.values() for output in task.outputs}
+    for task in self.tasks.values():
+      implicit = [producers[i] for i in task.inputs if i in producers and producers[i] != task.name]
+      task.deps = list(dict.fromkeys(task.deps + implicit))
+      for dep in task.deps:
+        if dep not in self.tasks:
+          raise ValueError(f"Unknown dependency of {task.name}: {dep}")
+
+    visiting, visited = set(), set()
+    def visit(name):
+      if name in visited:
+        return
+      if name in visiting:
+        raise ValueError(f"Dependency cycle through {name}")
+      visiting.add(name)
+      for dep in self.tasks[name].deps:
+        visit(dep)
+      visiting.discard(name)
+      visited.add(name)
+    for name in self.tasks:
+      visit(name)
+
+  def execute(self, task: Task, upstream_ran: bool) -> TaskRun:
+    signature = (task.signature or (lambda: file_signature(task.inputs)))()
+    outputs_exist = all(os.path.exists(o) for o in task.outputs)
+    if not upstream_ran and outputs_exist and self.state.get(task.name) == signature:
+      return TaskRun(name=task.name, stage=task.stage, status="skipped")
+
+    run = TaskRun(name=task.name, stage=task.stage, status="ran", start=time.perf_counter())
+    cpu_start = time.thread_time()
+    profile = None
+    if self.cprofile:
+      import cProfile # only loaded when profiling
+      profile = cProfile.Profile()
+    try:
+      if profile:
+        profile.enable()
+      task.run()
+      self.state[task.name] = signature
+    except Exception as e: # log and move on, dependents still run as with convert_all
+      print(f"Error in {task.name}: {e}")
+      run.status, run.error = "failed", str(e)
+      self.state.pop(task.name, None)
+    finally:
+      if profile:
+        profile.disable()
+    run.end = time.perf_counter()
+    run.wall_s = run.end - run.start
+    run.cpu_s = time.thread_time() - cpu_start
+    run.profile = profile
+    return run
+
+  def run(self):
+    """Runs tasks concurrently as soon as their dependencies are done."""
+    self.resolve_deps()
+    dependents = {name: [] for name in self.tasks}
+    waiting = {name: len(task.deps) for name, task in self.tasks.items()}
+    for task in self.tasks.values():
+      for dep in task.deps:
+        dependents[dep].append(task.name)
+
+    ready = [name for name, count in waiting.items() if not count]
+    with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+      running = {}
+      while ready or running:
+        for name in ready:
+          task = self.tasks[name]
+          upstream_ran = any(self.runs[dep].status != "skipped" for dep in task.deps)
+          running[pool.submit(self.execute, task, upstream_ran)] = name
+        ready = []
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+          name = running.pop(future)
+          self.runs[name] = future.result()
+          for dependent in dependents[name]:
+            waiting[dependent] -= 1
+            if not waiting[dependent]:
+              ready.append(dependent)
+
+    with open(self.state_path, "w") as f:
+      json.dump(self.state, f, indent=2)
+    return self.runs
+
+  def stage_report(self):
+    stages = {}
+    for run in self.runs.values():
+      stage = stages.setdefault(run.stage, {"wall_s": 0, "cpu_s": 0, "tasks": 0, "ran": 0, "skipped": 0, "failed": 0, "files": 0, "start": None, "end": None})
+      stage["tasks"] += 1
+      stage[run.status] += 1
+      if run.status == "skipped":
+        continue
+      stage["cpu_s"] += run.cpu_s
+      if run.status == "ran":
+        stage["files"] += len(self.tasks[run.name].outputs)
+      stage["start"] = run.start if stage["start"] is None else min(stage["start"], run.start)
+      stage["end"] = run.end if stage["end"] is None else max(stage["end"], run.end)
+    for stage in stages.values():
+      start, end = stage.pop("start"), stage.pop("end")
+      stage["wall_s"] = round(end - start, 4) if start is not None else 0
+      stage["cpu_s"] = round(stage["cpu_s"], 4)
+    return stages
+
+  def write_profile(self, path, wall_s, cpu_s, cprofile_dir=None):
+    """Writes per-stage and per-task timings to JSON, and merged cProfile dumps per stage."""
+    report = {
+      "wall_s": round(wall_s, 4),
+      "cpu_s": round(cpu_s, 4),
+      "jobs": self.jobs,
+      "stages": self.stage_report(),
+      "tasks": [{
+        "name": run.name,
+        "stage": run.stage,
+        "status": run.status,
+        "wall_s": round(run.wall_s, 4),
+        "cpu_s": round(run.cpu_s, 4),
+        "error": run.error
+      } for run in sorted(self.runs.values(), key=lambda r: -r.wall_s)]
+    }
+    if cprofile_dir:
+      import pstats
+      os.makedirs(cprofile_dir, exist_ok=True)
+      report["cprofile"] = {}
+      for stage in report["stages"]:
+        profiles = [r.profile for r in self.runs.values() if r.stage == stage and r.profile]
+        if profiles:
+          dump = os.path.join(cprofile_dir, f"{stage}.prof")
+          stats = pstats.Stats(profiles[0])
+          for profile in profiles[1:]:
+            stats.add(profile)
+          stats.dump_stats(dump)
+          report["cprofile"][stage] = dump
+    with open(path, "w") as f:
+      json.dump(report, f, indent=2)
+    print(f"Wrote build profile to {path}")
+    return report
+
+def add_convert_tasks(builder, path, conversion_map=converters.DEFAULT_CONVERSION_MAP):
+  """One task per converted file."""
+  tasks = []
+  for src, dst, ext, target_ext in converters.plan_conversions(path, conversion_map):
+    tasks.append(builder.add(Task(
+      name=f"convert:{dst}",
+      stage="convert",
+      run=lambda src=src, dst=dst, ext=ext, target_ext=target_ext: converters.convert_file(src, dst, ext, target_ext),
+      inputs=[src],
+      outputs=[dst]
+    )))
+  return tasks
+
+def add_index_tasks(builder, root, git_root="/", template_path="index_tpl.html", missing_alts=[]):
+  """One task per indexed directory, depending on the tasks writing into it."""
+  root = str(root)
+  parent = root.split("/")[-1]
+  template = web_indexer.load_template(template_path)
+  template_inputs = [web_indexer.template_file(template_path) or template_path] # URLs are tracked by name only
+  outputs_by_dir = {}
+  for task in builder.tasks.values():
+    for output in task.outputs:
+      outputs_by_dir.setdefault(os.path.dirname(output), []).append(output)
+
+  def signature(directory):
+    """Rendering parameters, template and listing, so that any of them changing re-renders the page."""
+    params = json.dumps([git_root, parent, sorted(a for a in missing_alts if os.path.dirname(a) == directory)])
+    return params + file_signature(template_inputs) + dir_signature(directory)
+
+  tasks = []
+  for directory in web_indexer.list_index_dirs(root):
+    tasks.append(builder.add(Task(
+      name=f"index:{directory}",
+      stage="index",
+      run=lambda directory=directory: web_indexer.create_index_html(
+        root=directory, git_root=git_root, parent=parent, template=template, missing_alts=missing_alts),
+      inputs=outputs_by_dir.get(directory, []) + template_inputs,
+      outputs=[os.path.join(directory, "index.html")],
+      signature=lambda directory=directory: signature(directory)
+    )))
+  return tasks
+
+def build(root, git_root="/static", conversion_map=None, jobs=os.cpu_count(), force=False,
+          state_path=DEFAULT_STATE_PATH, profile=None, cprofile_dir=None):
+  """Converts data files then indexes directories, running only what changed since the last build."""
+  if cprofile_dir and not profile:
+    profile = "build-profile.json" # cProfile dumps are written along the JSON report
+  conversion_map = conversion_map or {
+    "csv": ["json", "snap"],
+    "yaml": ["json"],
+    "json": [],
+    "md": ["html"]
+  }
+  start, cpu_start = time.perf_counter(), time.process_time()
+  builder = Builder(state_path=state_path, jobs=jobs, force=force, cprofile=bool(cprofile_dir))
+  converted = [t.outputs[0] for t in add_convert_tasks(builder, Path(root) / "data", conversion_map)]
+  add_index_tasks(builder, root, git_root=git_root, missing_alts=set(converted))
+  runs = builder.run()
+
+  for stage, report in builder.stage_report().items():
+    print(f"{stage}: {report['ran']} ran, {report['skipped']} skipped, {report['failed']} failed in {report['wall_s']:.2f}s")
+  if profile:
+    builder.write_profile(profile, time.perf_counter() - start, time.process_time() - cpu_start, cprofile_dir)
+  return runs
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Build static data and directory indexes")
+  parser.add_argument("-d", "--directory", type=str, default=str(Path.cwd() / "static"), help="The static root directory")
+  parser.add_argument("-g", "--git-root", type=str, default="/static", help="Path of the static root in the git repository")
+  parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Number of concurrent tasks")
+  parser.add_argument("-f", "--force", action="store_true", help="Rebuild everything regardless of changes")
+  parser.add_argument("-s", "--state", type=str, default=DEFAULT_STATE_PATH, help="Incremental build state file")
+  parser.add_argument("-p", "--profile", type=str, nargs="?", const="build-profile.json", help="Write per-stage and per-task timings to this JSON file")
+  parser.add_argument("--cprofile", type=str, help="Directory to dump per-stage cProfile stats to (implies --profile, runs tasks serially)")
+  args = parser.parse_args(argv)
+  return build(args.directory, git_root=args.git_root, jobs=args.jobs, force=args.force,
+               state_path=args.state, profile=args.profile, cprofile_dir=args.cprofile)
+
+if __name__ == "__main__":
+  main()
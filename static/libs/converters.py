@@ -2,9 +2,7 @@ import argparse
 import csv
 import json
 import os
-import markdown
 import re
-import ruamel.yaml as yaml
 from io import StringIO
 
 CSV_DELIMITERS = ",;|"
@@ -94,6 +92,7 @@ def json_to_csv(json_data):
 
 def yaml_to_json(yaml_data):
   """Converts YAML (file or string) to JSON."""
+  import ruamel.yaml as yaml # heavy, imported on first use
   yaml_data = get_data(yaml_data)
   parser = yaml.YAML(typ='safe', pure=True)
   yaml_data = parser.load(yaml_data)
@@ -101,17 +100,35 @@ def yaml_to_json(yaml_data):
 
 def json_to_yaml(json_data):
   """Converts JSON (file or string) to YAML."""
+  import ruamel.yaml as yaml
   json_data = get_data(json_data)
   data = json.loads(json_data) if isinstance(json_data, str) else json_data
   return yaml.dump(parse(data), default_style='|', default_flow_style=False)
 
 def markdown_to_html(md_data, extensions=[]):
   """Converts Markdown text to HTML using the python-markdown library."""
+  import markdown # heavy, imported on first use
   md_data = get_data(md_data)
   md = markdown.Markdown(extensions=extensions)
   html = md.convert(md_data)
   return html
 
+def csv_to_snapshot(csv_data):
+  """Converts CSV (file or string) to a memory-mappable columnar snapshot (bytes)."""
+  if __package__:
+    from .snapshot import csv_to_snapshot
+  else:
+    from snapshot import csv_to_snapshot
+  return csv_to_snapshot(csv_data)
+
+def json_to_snapshot(json_data):
+  """Converts a JSON array of objects (file or string) to a columnar snapshot (bytes)."""
+  if __package__:
+    from .snapshot import json_to_snapshot
+  else:
+    from snapshot import json_to_snapshot
+  return json_to_snapshot(json_data)
+
 EXT_BY_ALIAS = {
   "json": "json",
   "csv": "csv",
@@ -122,39 +139,49 @@ EXT_BY_ALIAS = {
 }
 
 CONVERTERS = {
-  "csv": {"json": csv_to_json, "yaml": lambda x: json_to_yaml(csv_to_json(x)), "md": lambda x: markdown_to_html(csv_to_json(x))},
-  "json": {"csv": json_to_csv, "yaml": json_to_yaml, "md": lambda x: markdown_to_html(json_to_yaml(x))},
+  "csv": {"json": csv_to_json, "yaml": lambda x: json_to_yaml(csv_to_json(x)), "md": lambda x: markdown_to_html(csv_to_json(x)), "snap": csv_to_snapshot},
+  "json": {"csv": json_to_csv, "yaml": json_to_yaml, "md": lambda x: markdown_to_html(json_to_yaml(x)), "snap": json_to_snapshot},
   "yaml": {"json": yaml_to_json, "csv": json_to_csv, "md": lambda x: markdown_to_html(json_to_yaml(x))},
   "md": {"html": markdown_to_html}
 }
 
-def convert_all(path, conversion_map={
+DEFAULT_CONVERSION_MAP = {
   "csv": ["json", "yaml"],
   "json": ["csv", "yaml"],
   "yaml": ["json", "csv"],
   "md": ["html"]
-}):
+}
 
-  """Crawls a directory and converts files based on the mapping."""
-  created = []
-  print(f"Converting files in {path}...")
+def plan_conversions(path, conversion_map=DEFAULT_CONVERSION_MAP):
+  """Lists (src, dst, src_ext, target_ext) conversions for the files of a directory."""
+  planned = []
   for root, _, files in os.walk(path):
     for file in files:
       src = os.path.join(root, file)
       ext = EXT_BY_ALIAS.get(os.path.splitext(file)[1].lower()[1:], "unsupported")
-
-      if ext in conversion_map:
-        for target_ext in conversion_map[ext]:
-          dst = os.path.splitext(src)[0] + "." + target_ext # create the output file name
-          print(f"Converting {src} to {dst}...")
-          try:
-            convert = CONVERTERS[ext][target_ext]
-            with open(dst, "w") as f:
-              f.write(convert(src))
-            created.append(dst)
-          except Exception as e: # catch any conversion errors
-            print(f"Error converting {src}: {e}")
-            continue # log and move on to the next file
+      for target_ext in conversion_map.get(ext, []):
+        dst = os.path.splitext(src)[0] + "." + target_ext # create the output file name
+        planned.append((src, dst, ext, target_ext))
+  return planned
+
+def convert_file(src, dst, ext, target_ext):
+  """Converts a single file, raising on conversion errors."""
+  converted = CONVERTERS[ext][target_ext](src)
+  with open(dst, "wb" if isinstance(converted, bytes) else "w") as f:
+    f.write(converted)
+  return dst
+
+def convert_all(path, conversion_map=DEFAULT_CONVERSION_MAP):
+  """Crawls a directory and converts files based on the mapping."""
+  created = []
+  print(f"Converting files in {path}...")
+  for src, dst, ext, target_ext in plan_conversions(path, conversion_map):
+    print(f"Converting {src} to {dst}...")
+    try:
+      created.append(convert_file(src, dst, ext, target_ext))
+    except Exception as e: # catch any conversion errors
+      print(f"Error converting {src}: {e}")
+      continue # log and move on to the next file
   print(f"Converted {len(created)} files.")
   return created
 
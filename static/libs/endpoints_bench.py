@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from aiohttp import web
+from prettytable import PrettyTable
+
+if __package__:
+  from .endpoints_status import EndpointChecker, peak_rss_kb
+else:
+  from endpoints_status import EndpointChecker, peak_rss_kb
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINES = Path(__file__).resolve().parents[2] / "benchmarks" / "endpoints_bench.json" # outside the published static tree
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "pareto")
+
+@dataclass
+class FleetSpec:
+  endpoints: int = 2000
+  domains: int = 100
+  latency: str = "lognormal"
+  latency_ms: float = 50
+  timeout_rate: float = 0.01
+  rpc_rate: float = 0.1  # Answer 404 to GET and JSON-RPC to POST
+  throttle_rate: float = 0.02  # Answer 429
+  request_timeout: float = 2
+  workers: int = 1  # check_all_endpoints_sharded workers, 1 to drive check_all_endpoints
+  seed: int = 42
+
+@dataclass
+class BenchResult:
+  name: str
+  spec: Dict
+  checks: int
+  healthy: int
+  wall_s: float
+  checks_per_s: float
+  peak_sockets: Optional[int]
+  peak_rss_mb: float
+  python: str = sys.version.split()[0]
+  cpus: Optional[int] = os.cpu_count()
+
+def sample_latency(rng: random.Random, distribution: str, mean_ms: float) -> float:
+  """Draw a simulated response latency in seconds."""
+  if distribution == "fixed":
+    ms = mean_ms
+  elif distribution == "uniform":
+    ms = rng.uniform(0, 2 * mean_ms)
+  elif distribution == "lognormal":
+    ms = rng.lognormvariate(0, 1) * mean_ms / 1.6487  # e^(1/2), so that the mean is mean_ms
+  elif distribution == "pareto":
+    ms = rng.paretovariate(3) * mean_ms * 2 / 3  # alpha=3 has a mean of 1.5
+  else:
+    raise ValueError(f"Unknown latency distribution: {distribution}")
+  return ms / 1000
+
+def build_fleet(spec: FleetSpec) -> List[Tuple[str, float]]:
+  """Deterministically assign a behavior and a latency to each simulated endpoint."""
+  rng = random.Random(spec.seed)
+  fleet = []
+  for _ in range(spec.endpoints):
+    roll = rng.random()
+    if roll < spec.timeout_rate:
+      kind = "timeout"
+    elif roll < spec.timeout_rate + spec.throttle_rate:
+      kind = "throttle"
+    elif roll < spec.timeout_rate + spec.throttle_rate + spec.rpc_rate:
+      kind = "rpc"
+    else:
+      kind = "ok"
+    fleet.append((kind, sample_latency(rng, spec.latency, spec.latency_ms)))
+  return fleet
+
+def fleet_hosts(domains: int) -> List[str]:
+  """Loopback addresses, one per simulated domain (127.0.0.0/8 is routed to lo on Linux)."""
+  return [f"127.0.{d // 250}.{d % 250 + 1}" for d in range(domains)]
+
+def fleet_urls(spec: FleetSpec, port: int) -> List[str]:
+  hosts = fleet_hosts(spec.domains)
+  return [f"http://{hosts[i % len(hosts)]}:{port}/ep/{i}" for i in range(spec.endpoints)]
+
+def free_port() -> int:
+  with socket.socket() as s:
+    s.bind(("127.0.0.1", 0))
+    return s.getsockname()[1]
+
+async def serve_fleet(spec: FleetSpec, port: int, ready):
+  fleet = build_fleet(spec)
+
+  async def handle(request: web.Request) -> web.Response:
+    kind, delay = fleet[int(request.match_info["i"]) % len(fleet)]
+    await asyncio.sleep(delay)
+    if kind == "timeout":
+      await asyncio.sleep(spec.request_timeout + 1)
+    elif kind == "throttle":
+      return web.Response(status=429, text="Too Many Requests")
+    elif kind == "rpc":
+      if request.method == "POST":
+        return web.json_response({"jsonrpc": "2.0", "id": 1, "result": "0x1"})
+      return web.Response(status=404, text="Not Found")
+    return web.json_response({"status": "ok"})
+
+  app = web.Application()
+  app.router.add_route("*", r"/ep/{i:\d+}{tail:.*}", handle)
+  runner = web.AppRunner(app, access_log=None)
+  await runner.setup()
+  for host in fleet_hosts(spec.domains):
+    await web.TCPSite(runner, host, port, backlog=1024).start()
+  ready.set()
+  await asyncio.Event().wait()
+
+def run_fleet_server(spec: FleetSpec, port: int, ready):
+  """Process entrypoint, so that the simulated fleet does not share the checker's event loop."""
+  asyncio.run(serve_fleet(spec, port, ready))
+
+def count_open_sockets() -> Optional[int]:
+  """Number of sockets held by this process, None where /proc is unavailable."""
+  try:
+    fds = os.listdir("/proc/self/fd")
+  except OSError:
+    return None
+  count = 0
+  for fd in fds:
+    try:
+      if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+        count += 1
+    except OSError:
+      continue
+  return count
+
+async def sample_sockets(peak: List[int], interval: float = 0.01):
+  while True:
+    count = count_open_sockets()
+    if count is None:
+      return
+    peak[0] = max(peak[0], count)
+    await asyncio.sleep(interval)
+
+async def drive_checker(config_path: str, spec: FleetSpec) -> Tuple[EndpointChecker, float, Optional[int]]:
+  checker = EndpointChecker(config_path)
+  checker.REQUEST_TIMEOUT = spec.request_timeout
+  peak = [0] if count_open_sockets() is not None else [None]
+  sampler = asyncio.create_task(sample_sockets(peak))
+  start_time = time.perf_counter()
+  await checker.check_all_endpoints()
+  wall_s = time.perf_counter() - start_time
+  sampler.cancel()
+  return checker, wall_s, peak[0]
+
+def drive_sharded_checker(config_path: str, spec: FleetSpec) -> Tuple[EndpointChecker, float, Optional[int]]:
+  """Sockets are held by the worker processes and are not sampled, their peak RSS is added to the parent's."""
+  checker = EndpointChecker(config_path)
+  checker.REQUEST_TIMEOUT = spec.request_timeout
+  start_time = time.perf_counter()
+  checker.check_all_endpoints_sharded(spec.workers)
+  return checker, time.perf_counter() - start_time, None
+
+def run_bench(spec: FleetSpec, name: str = "current") -> BenchResult:
+  """Start a simulated fleet in a child process and time `check_all_endpoints` against it."""
+  port = free_port()
+  ready = multiprocessing.Event()
+  server = multiprocessing.Process(target=run_fleet_server, args=(spec, port, ready), daemon=True)
+  server.start()
+  try:
+    if not ready.wait(timeout=30):
+      raise RuntimeError("Simulated fleet failed to start")
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+      f.write("\n".join(fleet_urls(spec, port)) + "\n")
+    try:
+      if spec.workers > 1:
+        checker, wall_s, peak_sockets = drive_sharded_checker(f.name, spec)
+      else:
+        checker, wall_s, peak_sockets = asyncio.run(drive_checker(f.name, spec))
+    finally:
+      os.unlink(f.name)
+  finally:
+    server.terminate()
+    server.join()
+
+  checks = len(checker.endpoints)
+  return BenchResult(
+    name=name,
+    spec=asdict(spec),
+    checks=checks,
+    healthy=sum(e.is_healthy for e in checker.endpoints),
+    wall_s=round(wall_s, 3),
+    checks_per_s=round(checks / wall_s, 1) if wall_s else 0,
+    peak_sockets=peak_sockets,
+    peak_rss_mb=round((peak_rss_kb() + sum(checker.worker_peak_rss_kb)) / 2**10, 1)
+  )
+
+def load_baselines(path: Path) -> Dict[str, Dict]:
+  if not path.exists():
+    return {}
+  with open(path, "r") as f:
+    return json.load(f)
+
+def save_baseline(result: BenchResult, path: Path):
+  baselines = load_baselines(path)
+  baselines[result.name] = asdict(result)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  with open(path, "w") as f:
+    json.dump(baselines, f, indent=2)
+    f.write("\n")
+  logger.info(f"Saved baseline '{result.name}' to {path}")
+
+def report(result: BenchResult, baseline: Optional[Dict] = None):
+  table = PrettyTable()
+  table.field_names = ["Metric", "Current"] + (["Baseline", "Delta"] if baseline else [])
+  table.align = "l"
+  for metric in ("checks", "healthy", "wall_s", "checks_per_s", "peak_sockets", "peak_rss_mb"):
+    current = getattr(result, metric)
+    row = [metric, current]
+    if baseline:
+      previous = baseline.get(metric)
+      delta = f"{(current - previous) / previous * 100:+.1f}%" if current is not None and previous else "n/a"
+      row += [previous, delta]
+    table.add_row(row)
+  logger.info(table)
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Benchmark EndpointChecker against a local simulated fleet")
+  parser.add_argument("-e", "--endpoints", type=int, default=FleetSpec.endpoints, help="Number of simulated endpoints")
+  parser.add_argument("-d", "--domains", type=int, default=FleetSpec.domains, help="Number of simulated domains (loopback addresses)")
+  parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default=FleetSpec.latency, help="Latency distribution")
+  parser.add_argument("--latency-ms", type=float, default=FleetSpec.latency_ms, help="Mean simulated latency")
+  parser.add_argument("--timeout-rate", type=float, default=FleetSpec.timeout_rate, help="Share of endpoints never answering in time")
+  parser.add_argument("--rpc-rate", type=float, default=FleetSpec.rpc_rate, help="Share of endpoints answering 404 to GET and JSON-RPC to POST")
+  parser.add_argument("--throttle-rate", type=float, default=FleetSpec.throttle_rate, help="Share of endpoints answering 429")
+  parser.add_argument("--request-timeout", type=float, default=FleetSpec.request_timeout, help="EndpointChecker.REQUEST_TIMEOUT override")
+  parser.add_argument("-w", "--workers", type=int, default=FleetSpec.workers, help="Drive the sharded checker with this many processes")
+  parser.add_argument("--seed", type=int, default=FleetSpec.seed, help="Fleet generation seed")
+  parser.add_argument("-b", "--baselines", type=str, default=str(DEFAULT_BASELINES), help="Baselines JSON file")
+  parser.add_argument("-s", "--save", type=str, help="Save the result as a named baseline")
+  parser.add_argument("-c", "--compare", type=str, help="Compare the result against a named baseline")
+  parser.add_argument("-v", "--verbose", action="store_true", help="Keep EndpointChecker's per-URL logging")
+  args = parser.parse_args()
+
+  if not args.verbose:
+    logging.getLogger("endpoints_status").setLevel(logging.WARNING)
+    logging.getLogger("static.libs.endpoints_status").setLevel(logging.WARNING)
+
+  spec = FleetSpec(
+    endpoints=args.endpoints,
+    domains=args.domains,
+    latency=args.latency,
+    latency_ms=args.latency_ms,
+    timeout_rate=args.timeout_rate,
+    rpc_rate=args.rpc_rate,
+    throttle_rate=args.throttle_rate,
+    request_timeout=args.request_timeout,
+    workers=args.workers,
+    seed=args.seed
+  )
+  baselines_path = Path(args.baselines)
+  result = run_bench(spec, name=args.save or "current")
+  baseline = None
+  if args.compare:
+    baseline = load_baselines(baselines_path).get(args.compare)
+    if baseline is None:
+      logger.warning(f"No baseline named '{args.compare}' in {baselines_path}")
+  report(result, baseline)
+  if args.save:
+    save_baseline(result, baselines_path)
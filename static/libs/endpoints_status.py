@@ -5,17 +5,29 @@ import yaml
 import csv
 import time
 import re
+import copy
+import math
+import bisect
+import sys
+import zlib
 import asyncio
 import aiohttp
-from typing import Dict, List, Optional, Set
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 from pathlib import Path
-from dataclasses import dataclass
-from urllib.parse import urlparse
+from dataclasses import dataclass, field
+from urllib.parse import urlparse, urlsplit, urlunsplit
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from prettytable import PrettyTable
 
+try:
+  import uvloop
+except ImportError:
+  uvloop = None
+
 # Configure logging
 logging.basicConfig(
   level=logging.INFO,
@@ -23,6 +35,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns of static/data tables holding URLs (JSON arrays or single URLs), extracted without regex
+URL_COLUMNS = {
+  'landing', 'app', 'docs', 'codebase', 'blog', 'twitter', 'discord', 'telegram', # brands
+  'links', # audits
+  'httpRpcs', 'explorers', 'explorerApi' # networks
+}
+SKIPPED_COLUMNS = {'wsRpcs'}
+CONFIG_SUFFIXES = ('.csv', '.yml', '.yaml', '.json') # by precedence, .json siblings are usually converted copies
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Already canonical but for a root path or an empty query: lowercase host, no port, userinfo or fragment
+CANONICAL_URL = re.compile(r'(https?://[a-z0-9.-]+)(/[^\s?#]*)?(\?[^\s#]*)?')
+VALID_HOST = re.compile(r'[a-z0-9.-]+|[0-9a-f:.]+') # hostname as parsed by urlsplit: lowercase, IPv6 unbracketed
+
 @dataclass
 class EndpointStatus:
   url: str
@@ -33,15 +58,43 @@ class EndpointStatus:
   is_slow: bool = False
   error: Optional[str] = None
 
+@dataclass
+class RpcStatus:
+  url: str
+  network: str
+  chain_id: Optional[int]
+  reported_chain_id: Optional[int] = None
+  block_height: Optional[int] = None
+  heights: List[Tuple[float, int]] = field(default_factory=list)  # (monotonic time, block height) of each sample
+  blocks_behind: Optional[int] = None
+  p50_ms: float = -1
+  p90_ms: float = -1
+  samples: int = 0
+  is_healthy: bool = False
+  error: Optional[str] = None
+
+def percentile(values: List[float], pct: float) -> float:
+  """Nearest-rank percentile, -1 if no values."""
+  if not values:
+    return -1
+  ordered = sorted(values)
+  rank = max(1, math.ceil(pct / 100 * len(ordered)))
+  return ordered[rank - 1]
+
 class EndpointChecker:
-  def __init__(self, config_path: str):
-    self.config_path = Path(config_path)
+  def __init__(self, config_path: Union[str, Path, List[Union[str, Path]]]):
+    self.config_paths = [Path(p) for p in config_path] if isinstance(config_path, (list, tuple)) else [Path(config_path)]
+    self.config_path = self.config_paths[0]
     self.endpoints: List[EndpointStatus] = []
     self.PING_THRESHOLD = 1000  # Consider endpoints with ping > 1000ms as slow
     self.MAX_CONCURRENT_REQUESTS = 50  # Overall concurrency limit
     self.MAX_PER_DOMAIN = 10  # Max concurrent requests per domain
     self.REQUEST_TIMEOUT = 10
     self.domain_semaphores = {}  # Semaphores for per-domain rate limiting
+    self.RPC_SAMPLES = 5  # eth_blockNumber calls per RPC when ranking by network
+    self.MAX_BLOCK_LAG = 20  # Consider RPCs more than 20 blocks behind the network head, as known when sampled, as lagging
+    self.networks: Dict[str, List[RpcStatus]] = {}
+    self.worker_peak_rss_kb: List[int] = []  # Peak RSS of each sharded worker
 
     # RPC patterns that should be checked as RPC first
     self.RPC_PATTERNS = [
@@ -126,52 +179,149 @@ class EndpointChecker:
         urls.update(self.extract_urls_from_object(item))
     return urls
 
-  def load_config(self) -> Set[str]:
-    """Load URLs from various config file formats."""
-    suffix = self.config_path.suffix.lower()
-    urls = set()
+  def canonicalize_url(self, url: str) -> Optional[str]:
+    """Normalize scheme/host case, default ports, root path and fragments, None if not a single http(s) URL."""
+    url = url.strip().rstrip(',').strip('"\'').strip()
+    match = CANONICAL_URL.fullmatch(url)
+    if match:
+      origin, path, query = match.groups()
+      return origin + ('' if path in (None, '/') else path) + (query if query and query != '?' else '')
+    if any(c.isspace() for c in url):
+      return None
+    try:
+      parts = urlsplit(url)
+      scheme = parts.scheme.lower()
+      host, port = parts.hostname, parts.port
+    except ValueError:
+      return None
+    if scheme not in DEFAULT_PORTS or not host or not VALID_HOST.fullmatch(host):
+      return None
+    userinfo, _, _ = parts.netloc.rpartition('@') # credentials are kept as is, some RPCs need them
+    netloc = f"[{host}]" if ':' in host else host
+    netloc = f"{userinfo}@{netloc}" if userinfo else netloc
+    if port and port != DEFAULT_PORTS[scheme]:
+      netloc += f":{port}"
+    path = '' if parts.path == '/' else parts.path
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
+  def canonicalize_urls(self, raw: str) -> List[str]:
+    """Canonical URLs of a raw value, extracting them from values that are not a single clean URL."""
+    url = self.canonicalize_url(raw)
+    if url is not None:
+      return [url]
+    extracted = self.extract_urls_from_string(re.sub(r',(?=\s|https?://)', ' ', raw)) - {raw} # eg. comma separated URLs
+    return sorted({url for url in map(self.canonicalize_url, extracted) if url is not None})
+
+  def split_url_cell(self, cell: str) -> List[str]:
+    """Structurally split a known URL column cell: a JSON array of URLs or a single URL."""
+    cell = cell.strip()
+    if not cell:
+      return []
+    if cell[0] == '[':
+      try:
+        values = json.loads(cell)
+        return [v for v in values if isinstance(v, str)] if isinstance(values, list) else []
+      except json.JSONDecodeError:
+        return list(self.extract_urls_from_string(cell))
+    return [cell]
+
+  def iter_config_files(self) -> Iterator[Path]:
+    """Expand config paths (files or directories) into config files, skipping converted JSON copies."""
+    seen = set()
+    for path in self.config_paths:
+      if path.is_dir():
+        files = sorted(p for p in path.rglob('*') if p.suffix.lower() in CONFIG_SUFFIXES and p.is_file())
+        sources = {p.with_suffix('') for p in files if p.suffix.lower() != '.json'}
+        files = [p for p in files if p.suffix.lower() != '.json' or p.with_suffix('') not in sources]
+      else:
+        files = [path]
+      for file in files:
+        resolved = file.resolve()
+        if resolved not in seen:
+          seen.add(resolved)
+          yield file
+
+  def iter_string_urls(self, text: str) -> Iterator[str]:
+    if '://' not in text:
+      return
+    text = text.strip()
+    if text.startswith('http') and not any(c.isspace() for c in text) and '"' not in text and ',' not in text:
+      yield text
+    else:
+      yield from self.extract_urls_from_string(text)
+
+  def iter_object_urls(self, obj) -> Iterator[str]:
+    """Walk a parsed JSON/YAML document for URLs."""
+    if isinstance(obj, str):
+      yield from self.iter_string_urls(obj)
+    elif isinstance(obj, dict):
+      for key, value in obj.items():
+        if key in SKIPPED_COLUMNS:
+          continue
+        yield from self.iter_object_urls(value)
+    elif isinstance(obj, (list, tuple)):
+      for item in obj:
+        yield from self.iter_object_urls(item)
 
-    logger.info(f"Loading config from {self.config_path}")
+  def iter_file_urls(self, path: Path) -> Iterator[str]:
+    """Raw URLs of a config file, structurally for known columns.
 
-    with open(self.config_path, 'r') as f:
+    CSV and plain text files are streamed row by row, JSON and YAML documents
+    are parsed whole before being walked.
+    """
+    suffix = path.suffix.lower()
+    with open(path, 'r') as f:
       if suffix == '.csv':
         reader = csv.reader(f)
+        header = next(reader, [])
+        url_columns = [i for i, name in enumerate(header) if name in URL_COLUMNS]
+        other_columns = [i for i, name in enumerate(header) if name not in URL_COLUMNS and name not in SKIPPED_COLUMNS]
         for row in reader:
-          # For CSV, check columns that are likely to contain URLs
-          for cell in row:
-            cell_urls = self.extract_urls_from_string(cell)
-            urls.update(cell_urls)
+          for i in url_columns:
+            if i < len(row):
+              yield from self.split_url_cell(row[i])
+          for i in other_columns:
+            if i < len(row):
+              yield from self.iter_string_urls(row[i])
+      elif suffix in ('.json', '.yml', '.yaml'):
+        try:
+          data = json.load(f) if suffix == '.json' else yaml.safe_load(f)
+        except (json.JSONDecodeError, yaml.YAMLError):
+          f.seek(0)
+          data = f.read()
+        yield from self.iter_object_urls(data)
       else:
-        content = f.read()
-        if suffix == '.json':
-          try:
-            data = json.loads(content)
-            urls = self.extract_urls_from_object(data)
-            if not urls:
-              urls = self.extract_urls_from_string(content)
-          except json.JSONDecodeError:
-            urls = self.extract_urls_from_string(content)
-        elif suffix in ['.yml', '.yaml']:
-          try:
-            data = yaml.safe_load(content)
-            urls = self.extract_urls_from_object(data)
-            if not urls:
-              urls = self.extract_urls_from_string(content)
-          except yaml.YAMLError:
-            urls = self.extract_urls_from_string(content)
-        else:
-          urls = self.extract_urls_from_string(content)
-
-    # Filter out websocket URLs
-    urls = {url for url in urls if url.startswith('http')}
+        for line in f:
+          yield from self.iter_string_urls(line)
 
-    # Debug output
-    logger.info(f"Found {len(urls)} unique URLs:")
+  def load_config(self) -> Set[str]:
+    """Load canonical URLs, deduplicated across all config files and directories."""
+    urls = set()
+    canonical = {}  # Raw URL to canonical URLs (empty if invalid), shared across files
+
+    for path in self.iter_config_files():
+      # Config files repeat URLs a lot, only canonicalize distinct raw strings
+      occurrences = {}
+      for raw in self.iter_file_urls(path):
+        occurrences[raw] = occurrences.get(raw, 0) + 1
+      found, invalid = 0, 0
+      for raw, count in occurrences.items():
+        if raw not in canonical:
+          canonical[raw] = self.canonicalize_urls(raw)
+        if not canonical[raw]:
+          invalid += count
+          logger.debug(f"Skipping invalid URL in {path}: {raw}")
+          continue
+        found += count * len(canonical[raw])
+        urls.update(canonical[raw])
+      logger.info(f"Loaded {found} URLs from {path}" + (f" ({invalid} invalid)" if invalid else ""))
+
+    logger.info(f"Found {len(urls)} unique URLs")
     for url in sorted(urls):
-      logger.info(f"  - {url}")
+      logger.debug(f"  - {url}")
 
     if not urls:
-      logger.warning(f"No URLs found in {self.config_path}")
+      logger.warning(f"No URLs found in {', '.join(map(str, self.config_paths))}")
 
     return urls
 
@@ -337,6 +487,151 @@ class EndpointChecker:
       tasks = [self.check_endpoint_with_rate_limit(session, url) for url in urls]
       return await asyncio.gather(*tasks)
 
+  def load_networks(self) -> Dict[str, Tuple[Optional[int], Set[str]]]:
+    """Load http RPCs from networks CSVs, keyed by network slug."""
+    networks = {}
+
+    for path in self.iter_config_files():
+      if path.suffix.lower() != '.csv':
+        continue
+      with open(path, 'r') as f:
+        for row in csv.DictReader(f):
+          slug = (row.get('slug') or '').strip()
+          if not slug or not row.get('httpRpcs'):
+            continue
+          try:
+            chain_id = int(row.get('id') or '')
+          except ValueError:
+            chain_id = None
+          urls = {self.canonicalize_url(url) for url in self.split_url_cell(row['httpRpcs'])} - {None}
+          if urls:
+            networks[slug] = (chain_id, urls)
+            logger.debug(f"Loaded {len(urls)} RPCs of {slug} from {path}")
+
+    logger.info(f"Found {sum(len(urls) for _, urls in networks.values())} RPCs across {len(networks)} networks")
+    return networks
+
+  async def rpc_call(self, session: aiohttp.ClientSession, url: str, method: str) -> Tuple[Optional[int], float]:
+    """Send a parameterless JSON-RPC call, return its hex result as int and the ping in ms."""
+    start_time = time.time()
+    payload = {"jsonrpc": "2.0", "method": method, "params": [], "id": 1}
+    async with session.post(url, json=payload, timeout=self.REQUEST_TIMEOUT) as response:
+      body = await response.json(content_type=None)
+      ping_ms = (time.time() - start_time) * 1000
+      if response.status != 200:
+        raise ValueError(f"HTTP {response.status}")
+      if not isinstance(body, dict) or 'result' not in body:
+        error = body.get('error') if isinstance(body, dict) else None
+        raise ValueError(f"Invalid response to {method}: {error or body}")
+      return int(body['result'], 16), ping_ms
+
+  async def check_rpc(self, url: str, network: str, chain_id: Optional[int]) -> RpcStatus:
+    """Sample an RPC's latency and block height over one kept-alive connection, and verify the chain it serves."""
+    status = RpcStatus(url=url, network=network, chain_id=chain_id)
+    latencies = []
+    # A single pooled connection per RPC, so that samples measure RPC latency rather than TCP/TLS setup
+    connector = aiohttp.TCPConnector(limit=1)
+    timeout = aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
+
+    async with self.get_domain_semaphore(self.get_domain_from_url(url)):
+      try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+          # The first call opens the connection, its latency is discarded
+          status.reported_chain_id, _ = await self.rpc_call(session, url, 'eth_chainId')
+          if chain_id is not None and status.reported_chain_id != chain_id:
+            status.error = f"Wrong chain: expected {chain_id}, got {status.reported_chain_id}"
+          else:
+            for _ in range(self.RPC_SAMPLES):
+              status.block_height, ping_ms = await self.rpc_call(session, url, 'eth_blockNumber')
+              status.heights.append((time.monotonic(), status.block_height))
+              latencies.append(ping_ms)
+      except asyncio.TimeoutError:
+        status.error = 'Timeout'
+      except Exception as e:
+        status.error = str(e) or type(e).__name__
+
+    status.samples = len(latencies)
+    status.p50_ms = percentile(latencies, 50)
+    status.p90_ms = percentile(latencies, 90)
+    status.is_healthy = status.error is None and status.block_height is not None
+    return status
+
+  def rank_network_rpcs(self, statuses: List[RpcStatus]) -> List[RpcStatus]:
+    """Flag lagging RPCs against the network head and order by health, p90 latency and freshness.
+
+    RPCs finish sampling at different times, so each last sample is compared to the
+    highest height any RPC of the network had reported by then, not to the final head.
+    """
+    samples = sorted(sample for s in statuses if s.is_healthy for sample in s.heights)
+    times, heads = [t for t, _ in samples], []
+    for _, height in samples:
+      heads.append(max(height, heads[-1]) if heads else height)
+    for status in statuses:
+      if not status.is_healthy:
+        continue
+      observed_at, height = status.heights[-1]
+      status.blocks_behind = heads[bisect.bisect_right(times, observed_at) - 1] - height
+      if status.blocks_behind > self.MAX_BLOCK_LAG:
+        status.is_healthy = False
+        status.error = f"Lagging: {status.blocks_behind} blocks behind"
+    return sorted(statuses, key=lambda s: (
+      not s.is_healthy,
+      s.p90_ms if s.p90_ms >= 0 else float('inf'),
+      s.blocks_behind if s.blocks_behind is not None else float('inf'),
+      s.url
+    ))
+
+  async def check_all_network_rpcs(self):
+    """Check every RPC of every network and rank them per network."""
+    networks = self.load_networks()
+    semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+    async def check(url, slug, chain_id):
+      async with semaphore:
+        return await self.check_rpc(url, slug, chain_id)
+
+    results = await asyncio.gather(*[
+      check(url, slug, chain_id)
+      for slug, (chain_id, urls) in networks.items()
+      for url in sorted(urls)
+    ])
+
+    by_network = {slug: [] for slug in networks}
+    for status in results:
+      by_network[status.network].append(status)
+    self.networks = {slug: self.rank_network_rpcs(statuses) for slug, statuses in by_network.items()}
+
+    for slug, statuses in self.networks.items():
+      healthy = sum(s.is_healthy for s in statuses)
+      best = f" - Best: {statuses[0].url} ({statuses[0].p90_ms:.1f}ms p90)" if healthy else ""
+      logger.info(f"{slug}: {healthy}/{len(statuses)} healthy{best}")
+
+  def write_rpc_ranking(self, output_path: str) -> Path:
+    """Write the per-network RPC ranking to JSON."""
+    chain_ids = {s.network: s.chain_id for statuses in self.networks.values() for s in statuses}
+    ranking = {
+      slug: {
+        "id": chain_ids.get(slug),
+        "httpRpcs": [s.url for s in statuses if s.is_healthy],
+        "checks": [{
+          "url": s.url,
+          "healthy": s.is_healthy,
+          "p50Ms": round(s.p50_ms, 1),
+          "p90Ms": round(s.p90_ms, 1),
+          "samples": s.samples,
+          "blockHeight": s.block_height,
+          "blocksBehind": s.blocks_behind,
+          "chainId": s.reported_chain_id,
+          "error": s.error
+        } for s in statuses]
+      } for slug, statuses in self.networks.items()
+    }
+    output_path = Path(output_path)
+    with open(output_path, 'w') as f:
+      json.dump({"generatedAt": int(time.time()), "networks": ranking}, f, indent=2)
+    logger.info(f"Wrote RPC ranking for {len(ranking)} networks to {output_path}")
+    return output_path
+
   def report_problems(self):
     """Generate a clean tabular report of endpoint status."""
     # Create tables for different categories
@@ -415,12 +710,8 @@ class EndpointChecker:
       logger.info("\n=== Failed Endpoints ===")
       logger.info(error_table)
 
-  async def check_all_endpoints(self):
-    """Check all endpoints from the config file with progress tracking."""
-    urls = list(self.load_config())
-    total_urls = len(urls)
-    logger.info(f"Found {total_urls} endpoints to check")
-
+  async def check_urls(self, urls: List[str], on_batch: Optional[Callable[[List[EndpointStatus]], None]] = None) -> List[EndpointStatus]:
+    """Check URLs in domain-interleaved batches, calling on_batch with each batch's results."""
     # Group URLs by domain for better rate limiting
     domain_groups = {}
     for url in urls:
@@ -430,9 +721,8 @@ class EndpointChecker:
       domain_groups[domain].append(url)
 
     # Process URLs in interleaved batches to distribute load
-    processed = 0
     results = []
-    while processed < total_urls:
+    while len(results) < len(urls):
       batch = []
       # Take one URL from each domain group until we reach batch size
       for domain, domain_urls in domain_groups.items():
@@ -446,11 +736,6 @@ class EndpointChecker:
 
       batch_results = await self.check_endpoints_batch(batch)
       results.extend(batch_results)
-      processed += len(batch)
-
-      # Log progress
-      progress = (processed / total_urls) * 100
-      logger.info(f"Progress: {processed}/{total_urls} ({progress:.1f}%)")
 
       # Log results as they come in
       for status in batch_results:
@@ -462,20 +747,130 @@ class EndpointChecker:
             f"Status: {status.status_code} - Type: {status.endpoint_type}"
           )
 
+      if on_batch:
+        on_batch(batch_results)
+
+    return results
+
+  def log_progress(self, processed: int, total: int):
+    progress = (processed / total) * 100 if total else 100
+    logger.info(f"Progress: {processed}/{total} ({progress:.1f}%)")
+
+  async def check_all_endpoints(self):
+    """Check all endpoints from the config file with progress tracking."""
+    urls = list(self.load_config())
+    total_urls = len(urls)
+    logger.info(f"Found {total_urls} endpoints to check")
+
+    processed = [0]
+    def on_batch(batch_results: List[EndpointStatus]):
+      processed[0] += len(batch_results)
+      self.log_progress(processed[0], total_urls)
+
+    self.endpoints = await self.check_urls(urls, on_batch)
+
+  def get_shard(self, url: str, shards: int) -> int:
+    """Stable shard index of a URL's domain, so that each domain is checked by a single worker."""
+    return zlib.crc32(self.get_domain_from_url(url).encode()) % shards
+
+  def check_all_endpoints_sharded(self, workers: int):
+    """Check all endpoints from the config file across worker processes sharded by domain."""
+    urls = list(self.load_config())
+    total_urls = len(urls)
+    workers = max(1, min(workers, total_urls))
+    logger.info(f"Found {total_urls} endpoints to check across {workers} workers")
+
+    shards = [[] for _ in range(workers)]
+    for url in urls:
+      shards[self.get_shard(url, workers)].append(url)
+
+    # Per-domain limits stay global as a domain lives in one shard, the overall limit is split
+    shard_checker = copy.copy(self)
+    shard_checker.domain_semaphores = {}
+    shard_checker.MAX_CONCURRENT_REQUESTS = max(1, math.ceil(self.MAX_CONCURRENT_REQUESTS / workers))
+
+    ctx = multiprocessing.get_context('spawn')
+    connections, processes = [], []
+    for shard in shards:
+      if not shard:
+        continue
+      receiver, sender = ctx.Pipe(duplex=False)
+      process = ctx.Process(target=run_shard, args=(shard_checker, shard, sender, logger.getEffectiveLevel()), daemon=True)
+      process.start()
+      sender.close()
+      connections.append(receiver)
+      processes.append(process)
+
+    results = []
+    self.worker_peak_rss_kb = []
+    while connections:
+      for conn in wait(connections):
+        try:
+          batch_results = conn.recv()
+        except EOFError:  # Worker died without its end-of-shard marker
+          batch_results = None
+        if not isinstance(batch_results, list):  # End-of-shard marker, the worker's peak RSS
+          if batch_results is not None:
+            self.worker_peak_rss_kb.append(batch_results)
+          connections.remove(conn)
+          conn.close()
+          continue
+        results.extend(batch_results)
+        self.log_progress(len(results), total_urls)
+
+    for process in processes:
+      process.join()
+      if process.exitcode:
+        logger.error(f"Worker {process.pid} exited with code {process.exitcode}")
+
     self.endpoints = results
 
-async def main_async(config_path: str):
+def peak_rss_kb() -> int:
+  """Peak RSS of this process in kB, 0 where the POSIX resource module is unavailable."""
+  try:
+    import resource
+  except ImportError:
+    return 0
+  rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return rss // 1024 if sys.platform == 'darwin' else rss  # bytes on macOS, kB elsewhere
+
+def run_shard(checker: EndpointChecker, urls: List[str], conn, log_level: int = logging.INFO):
+  """Worker process entrypoint: check a shard on its own event loop, streaming results back."""
+  logger.setLevel(log_level)
+  run = uvloop.run if uvloop and hasattr(uvloop, 'run') else asyncio.run
+  try:
+    run(checker.check_urls(urls, conn.send))
+  finally:
+    conn.send(peak_rss_kb())
+    conn.close()
+
+async def main_async(config_path: Union[str, List[str]], by_network: bool = False, output: str = 'rpcs-by-network.json'):
   checker = EndpointChecker(config_path)
-  await checker.check_all_endpoints()
-  checker.report_problems()
-
-def main(config_path: str):
-  asyncio.run(main_async(config_path))
+  if by_network:
+    await checker.check_all_network_rpcs()
+    checker.write_rpc_ranking(output)
+  else:
+    await checker.check_all_endpoints()
+    checker.report_problems()
+
+def main(config_path: Union[str, List[str]], by_network: bool = False, output: str = 'rpcs-by-network.json', workers: int = 1):
+  if workers > 1 and by_network:
+    raise ValueError("Sharded checking (workers > 1) is not supported with by_network")
+  if workers > 1:
+    checker = EndpointChecker(config_path)
+    checker.check_all_endpoints_sharded(workers)
+    checker.report_problems()
+  else:
+    asyncio.run(main_async(config_path, by_network, output))
 
 if __name__ == "__main__":
-  import sys
-  if len(sys.argv) != 2:
-    print("Usage: python endpoints_status.py <config_file>")
-    sys.exit(1)
-
-  main(sys.argv[1])
+  import argparse
+  parser = argparse.ArgumentParser(description="Check the status of endpoints listed in a config file")
+  parser.add_argument("config_files", type=str, nargs="+", help="CSV/JSON/YAML files or directories to extract endpoints from")
+  parser.add_argument("-n", "--by-network", action="store_true", help="Rank the httpRpcs of each network (networks.csv) instead")
+  parser.add_argument("-o", "--output", type=str, default="rpcs-by-network.json", help="Output path of the per-network RPC ranking")
+  parser.add_argument("-w", "--workers", type=int, default=1, help="Shard endpoints by domain across this many processes")
+  args = parser.parse_args()
+  if args.workers > 1 and args.by_network:
+    parser.error("--workers is not supported with --by-network")
+  main(args.config_files, args.by_network, args.output, args.workers)
@@ -0,0 +1,65 @@
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Dependencies that must only load on first use of the functions needing them
+HEAVY_MODULES = ("markdown", "ruamel", "jinja2", "requests", "aiohttp", "prettytable", "yaml")
+
+# Cumulative import time budgets (ms) of the entry points used by hooks and CI, as
+# module names or statements, the latter also covering lazy attribute resolution
+BUDGETS_MS = {
+  "static": 10,
+  "static.libs": 10,
+  "static.libs.converters": 30,
+  "static.libs.web_indexer": 30,
+  "static.libs.builder": 60,
+  "import static; static.csv_to_json": 40,
+  "from static import *; csv_to_json, generate_index_files": 40
+}
+
+def imported_modules(code):
+  """Runs code in a fresh interpreter with -X importtime, returns {module: (depth, cumulative_us)}."""
+  result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+  if result.returncode:
+    raise RuntimeError(f"Failed to run {code!r}: {result.stderr.strip().splitlines()[-1:]}")
+  modules = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith("import time:") or "|" not in line:
+      continue
+    _, cumulative, name = line[len("import time:"):].split("|")
+    if not cumulative.strip().isdigit(): # header
+      continue
+    modules[name.strip()] = (len(name) - len(name.lstrip()) - 1, int(cumulative))
+  return modules
+
+def measure(entry, baseline):
+  """Cumulative import time (ms) of an entry point and the heavy modules it pulls, ignoring interpreter startup."""
+  modules = imported_modules(entry if " " in entry else f"import {entry}")
+  total_us = sum(us for name, (depth, us) in modules.items() if depth == 0 and name not in baseline)
+  heavy = sorted({name.split(".")[0] for name in modules if name.split(".")[0] in HEAVY_MODULES})
+  return total_us / 1000, heavy
+
+def check(budgets=BUDGETS_MS, scale=1.0):
+  baseline = imported_modules("pass")
+  failures = []
+  for entry, budget in budgets.items():
+    try:
+      ms, heavy = measure(entry, baseline)
+    except RuntimeError as e:
+      print(f"FAIL {entry:<56} {e}")
+      failures.append(entry)
+      continue
+    ok = ms <= budget * scale and not heavy
+    print(f"{'ok' if ok else 'FAIL':<4} {entry:<56} {ms:6.1f}ms / {budget * scale:.0f}ms" + (f" loads {', '.join(heavy)}" if heavy else ""))
+    if not ok:
+      failures.append(entry)
+  return failures
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Check the import time budget of static.libs entry points")
+  parser.add_argument("-s", "--scale", type=float, default=1.0, help="Budget multiplier for slow machines")
+  args = parser.parse_args()
+  sys.exit(1 if check(scale=args.scale) else 0)
@@ -0,0 +1,322 @@
+"""Columnar snapshots of static data tables, memory-mapped on load.
+
+Layout (little-endian): an 8 bytes magic, the u32 length of a JSON header, the
+header itself describing the sections that follow, each aligned on 8 bytes:
+- an interned string table (u32 offsets + utf-8 blob) shared by all columns
+- one array per column: q (int) or d (float) with an optional byte mask of
+  nulls, or H/I (string id, the type's max value for nulls) with, for mixed
+  columns, a byte mask of the values stored JSON-encoded
+- open-addressing hash indexes (crc32 of the lowercased key) mapping keys to
+  postings of row numbers, so that lookups are O(1) without parsing rows.
+  Keys are not stored, candidates are checked against their first row.
+  Composite indexes cover column tuples, eg. (nativeNetwork, nativeAddress)
+  as the same address can be deployed on several networks
+"""
+import csv
+import sys
+import json
+import mmap
+import zlib
+import array
+import struct
+import argparse
+from io import StringIO
+
+if __package__:
+  from .converters import get_data, parse
+else:
+  from converters import get_data, parse
+
+MAGIC = b"STSNAP02"
+INT64_RANGE = (-2**63, 2**63 - 1)
+DEFAULT_INDEXES = ("slug", "nativeAddress", "nativeNetwork", ("nativeNetwork", "nativeAddress"))
+KEY_SEPARATOR = "\x1f" # joins the values of composite index keys
+
+def index_name(columns):
+  """Header name of an index on a column or a tuple of columns, eg. nativeNetwork+nativeAddress."""
+  return columns if isinstance(columns, str) else "+".join(columns)
+
+def index_key(values):
+  values = (values,) if isinstance(values, str) or not isinstance(values, (tuple, list)) else values
+  return KEY_SEPARATOR.join(str(v).lower() for v in values)
+
+def uint_array(values, max_value):
+  """Smallest unsigned array (16 or 32 bits) holding values up to max_value."""
+  return array.array("H" if max_value < 0xFFFF else "I", values)
+
+def flatten(row, prefix=""):
+  flat = {}
+  for key, value in row.items():
+    if isinstance(value, dict):
+      flat.update(flatten(value, prefix + key + "."))
+    else:
+      flat[prefix + key] = value
+  return flat
+
+def unflatten(flat):
+  """Rebuilds nested rows from dotted keys, as csv_to_json does."""
+  row = {}
+  for key, value in flat.items():
+    parts = key.split(".")
+    current = row
+    for part in parts[:-1]:
+      current = current.setdefault(part, {})
+    current[parts[-1]] = value
+  return row
+
+def csv_rows(csv_data):
+  """Flat rows of a CSV (file or string), with values parsed as in csv_to_json."""
+  reader = csv.DictReader(StringIO(get_data(csv_data)))
+  return [{key: parse(value) for key, value in row.items()} for row in reader]
+
+def column_kind(values):
+  kinds = {type(v) for v in values if v is not None}
+  if kinds <= {int} and all(INT64_RANGE[0] <= v <= INT64_RANGE[1] for v in values if v is not None):
+    return "int"
+  if kinds <= {int, float}:
+    return "float"
+  if kinds <= {str}:
+    return "str"
+  return "mixed"
+
+class _Writer:
+  def __init__(self):
+    self.sections = []
+    self.size = 0
+    self.strings = {}
+
+  def section(self, data):
+    """Appends an array/bytes section, returns its [offset, count, typecode] descriptor."""
+    raw = data.tobytes() if isinstance(data, array.array) else bytes(data)
+    if isinstance(data, array.array) and sys.byteorder != "little":
+      swapped = array.array(data.typecode, data)
+      swapped.byteswap()
+      raw = swapped.tobytes()
+    descriptor = [self.size, len(data), data.typecode if isinstance(data, array.array) else "B"]
+    padding = -len(raw) % 8
+    self.sections.append(raw + b"\0" * padding)
+    self.size += len(raw) + padding
+    return descriptor
+
+  def intern(self, s):
+    if s not in self.strings:
+      self.strings[s] = len(self.strings)
+    return self.strings[s]
+
+def write_snapshot(rows, indexes=DEFAULT_INDEXES):
+  """Encodes rows (list of dicts, nested or flat) to snapshot bytes."""
+  rows = [flatten(row) for row in rows]
+  names = list(dict.fromkeys(key for row in rows for key in row))
+  writer = _Writer()
+  columns = []
+
+  for name in names:
+    values = [row.get(name) for row in rows]
+    kind = column_kind(values)
+    mask = None
+    if kind == "int":
+      data = array.array("q", (0 if v is None else v for v in values))
+    elif kind == "float":
+      data = array.array("d", (0.0 if v is None else float(v) for v in values))
+    else:
+      ids = [None if v is None else writer.intern(v if isinstance(v, str) else json.dumps(v, separators=(",", ":"))) for v in values]
+      null_id = 0xFFFF if len(writer.strings) < 0xFFFF else 0xFFFFFFFF
+      data = uint_array((null_id if i is None else i for i in ids), len(writer.strings))
+    if kind in ("int", "float") and any(v is None for v in values):
+      mask = bytes(v is None for v in values)
+    elif kind == "mixed":
+      mask = bytes(v is not None and not isinstance(v, str) for v in values)
+    columns.append({
+      "name": name,
+      "kind": kind,
+      "data": writer.section(data),
+      "mask": writer.section(mask) if mask else None
+    })
+
+  built = {}
+  for indexed in indexes:
+    indexed = (indexed,) if isinstance(indexed, str) else tuple(indexed)
+    if any(c not in names for c in indexed):
+      continue
+    groups = {}
+    for i, row in enumerate(rows):
+      values = [row.get(c) for c in indexed]
+      if None not in values:
+        groups.setdefault(index_key(values), []).append(i)
+    capacity = 1 << max(3, (2 * len(groups) - 1).bit_length()) # load factor <= 0.5
+    slots = [0] * capacity
+    starts, counts, postings = [], [], []
+    for group, (key, group_rows) in enumerate(groups.items()):
+      starts.append(len(postings))
+      counts.append(len(group_rows))
+      postings.extend(group_rows)
+      slot = zlib.crc32(key.encode()) & (capacity - 1)
+      while slots[slot]:
+        slot = (slot + 1) & (capacity - 1)
+      slots[slot] = group + 1
+    built[index_name(indexed)] = {
+      "columns": list(indexed),
+      "slots": writer.section(uint_array(slots, len(groups))),
+      "starts": writer.section(uint_array(starts, len(postings))),
+      "counts": writer.section(uint_array(counts, max(counts, default=0))),
+      "postings": writer.section(uint_array(postings, len(rows)))
+    }
+
+  blob = bytearray()
+  offsets = array.array("I", [0])
+  for s in writer.strings: # insertion ordered, matches interned ids
+    blob += s.encode()
+    offsets.append(len(blob))
+  header = json.dumps({
+    "rows": len(rows),
+    "columns": columns,
+    "indexes": built,
+    "strings": {"offsets": writer.section(offsets), "blob": writer.section(blob)}
+  }, separators=(",", ":")).encode()
+  header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+  return MAGIC + struct.pack("<I", len(header)) + header + b"".join(writer.sections)
+
+def csv_to_snapshot(csv_data, indexes=DEFAULT_INDEXES):
+  """Converts CSV (file or string) to snapshot bytes."""
+  return write_snapshot(csv_rows(csv_data), indexes)
+
+def json_to_snapshot(json_data, indexes=DEFAULT_INDEXES):
+  """Converts a JSON array of objects (file or string) to snapshot bytes."""
+  json_data = get_data(json_data)
+  data = json.loads(json_data) if isinstance(json_data, str) else json_data
+  return write_snapshot(data, indexes)
+
+class Snapshot:
+  """Read-only view over a memory-mapped (or in-memory) snapshot, rows are decoded on access."""
+
+  def __init__(self, buffer):
+    self._buffer = buffer
+    view = memoryview(buffer)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+      raise ValueError("Not a static data snapshot")
+    header_len = struct.unpack_from("<I", view, len(MAGIC))[0]
+    start = len(MAGIC) + 4
+    self._data = view[start + header_len:]
+    meta = json.loads(bytes(view[start:start + header_len]))
+    self.rows = meta["rows"]
+    self._offsets = self._array(meta["strings"]["offsets"])
+    self._blob = self._array(meta["strings"]["blob"])
+    self.columns = {c["name"]: c["kind"] for c in meta["columns"]}
+    self._columns = {c["name"]: (c["kind"], self._array(c["data"]), c["mask"] and self._array(c["mask"])) for c in meta["columns"]}
+    self._indexes = {
+      name: {part: d if part == "columns" else self._array(d) for part, d in index.items()}
+      for name, index in meta["indexes"].items()
+    }
+
+  @classmethod
+  def open(cls, path):
+    with open(path, "rb") as f:
+      return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+  def close(self):
+    """Releases the mapping, views handed out before become invalid."""
+    for _, data, mask in self._columns.values():
+      data.release()
+      if mask:
+        mask.release()
+    for index in self._indexes.values():
+      for part, data in index.items():
+        if part != "columns":
+          data.release()
+    for name in ("_offsets", "_blob", "_data"):
+      getattr(self, name).release()
+    if isinstance(self._buffer, mmap.mmap):
+      self._buffer.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  def _array(self, descriptor):
+    offset, count, typecode = descriptor
+    itemsize = struct.calcsize(typecode)
+    view = self._data[offset:offset + count * itemsize]
+    if typecode == "B":
+      return view
+    if sys.byteorder != "little":
+      swapped = array.array(typecode, view.tobytes())
+      swapped.byteswap()
+      return memoryview(swapped)
+    return view.cast(typecode)
+
+  def string(self, i):
+    return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+  def value(self, name, i):
+    kind, data, mask = self._columns[name]
+    if kind in ("int", "float"):
+      return None if mask and mask[i] else data[i]
+    if data[i] == (1 << 8 * data.itemsize) - 1: # null id
+      return None
+    s = self.string(data[i])
+    return json.loads(s) if mask and mask[i] else s
+
+  def row(self, i, flat=False):
+    row = {name: self.value(name, i) for name in self._columns}
+    return row if flat else unflatten(row)
+
+  def __len__(self):
+    return self.rows
+
+  def __iter__(self):
+    return (self.row(i) for i in range(self.rows))
+
+  def column(self, name):
+    return [self.value(name, i) for i in range(self.rows)]
+
+  def find_rows(self, name, key):
+    """Row numbers of rows whose indexed column (or tuple of columns) equals key (case-insensitive).
+
+    eg. find_rows(("nativeNetwork", "nativeAddress"), ("zksync-era-mainnet", "0x..."))
+    """
+    name = index_name(name)
+    index = self._indexes.get(name)
+    if index is None:
+      raise KeyError(f"No index on {name}, indexed: {', '.join(self._indexes)}")
+    key = index_key(key)
+    slots = index["slots"]
+    mask = len(slots) - 1
+    slot = zlib.crc32(key.encode()) & mask
+    while slots[slot]:
+      group = slots[slot] - 1
+      start = index["starts"][group]
+      first = index["postings"][start]
+      if index_key([self.value(c, first) for c in index["columns"]]) == key:
+        return list(index["postings"][start:start + index["counts"][group]])
+      slot = (slot + 1) & mask
+    return []
+
+  def find(self, name, key):
+    return [self.row(i) for i in self.find_rows(name, key)]
+
+  def get(self, name, key, default=None):
+    """First matching row in file order: only unambiguous on unique keys.
+
+    nativeAddress is not unique across networks, look tokens up by address with
+    the (nativeNetwork, nativeAddress) index, or use find for all matches.
+    """
+    rows = self.find_rows(name, key)
+    return self.row(rows[0]) if rows else default
+
+def load(path):
+  """Memory-maps a snapshot file."""
+  return Snapshot.open(path)
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Query a static data snapshot")
+  parser.add_argument("snapshot", type=str, help="The .snap file")
+  parser.add_argument("column", type=str, nargs="?", help="Indexed column(s) to look up, eg. nativeAddress or nativeNetwork+nativeAddress")
+  parser.add_argument("key", type=str, nargs="*", help="Value(s) to look up, one per indexed column")
+  args = parser.parse_args()
+  with load(args.snapshot) as snap:
+    if args.column:
+      print(json.dumps(snap.find(args.column.split("+"), args.key), indent=2))
+    else:
+      print(json.dumps({"rows": len(snap), "columns": snap.columns, "indexes": list(snap._indexes)}, indent=2))
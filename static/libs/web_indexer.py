@@ -3,8 +3,6 @@ import argparse
 import datetime
 from pathlib import Path
 import re
-from jinja2 import Template
-import requests
 
 EXT_EMOJIS = {
   "folder": "📁",
@@ -33,7 +31,7 @@ EXT_BY_TYPE = {
   "font": {".ttf", ".otf", ".woff", ".woff2", ".eot", ".afm", ".dfont", ".pfa", ".pfb",
            ".pfm", ".suit", ".mf", ".cff", ".cid", ".otc", ".ttc", ".fnt", ".fon", ".bdf",
            ".pfr", ".sfd", ".otb", ".ttx", ".amfm", ".acfm"},
-  "data": {".json", ".pickle", ".proto", ".xml"},
+  "data": {".json", ".pickle", ".proto", ".xml", ".snap"},
   "table": {".csv", ".tsv", ".tab", ".xls", ".xlsx", ".xlsm", ".ods", ".db", ".dbf",
             ".sqlite", ".sqlite3", ".sql", ".mdb", ".accdb", ".dta", ".sav", ".sas7bdat",
             ".rds", ".rdata", ".feather", ".arrow", ".hdf5", ".h5", ".nc", ".nc4", ".nc4c",
@@ -118,6 +116,32 @@ def create_index_html(root, git_root, parent, template, missing_alts={}):
     f.write(html_content)
   return path
 
+def template_file(template_path="index_tpl.html"):
+  """Local path of a template, relative paths being resolved against this directory (None for URLs)."""
+  if template_path.startswith("http"):
+    return None
+  return str(Path(__file__).parent / template_path) if not template_path.startswith("/") else template_path
+
+def load_template(template_path="index_tpl.html"):
+  from jinja2 import Template # heavy, imported on first use
+  if template_path.startswith("http"):
+    import requests
+    tpl = requests.get(template_path).text # eg. https://cdn.astrolab.fi/libs/index_tpl.html
+  else:
+    with open(template_file(template_path), "r") as f:
+      tpl = f.read()
+  return Template(tpl)
+
+def list_index_dirs(root):
+  """Lists the directories to index under root (included), skipping excluded folders."""
+  if os.path.basename(str(root)) in DEFAULT_EXCLUDES:
+    return []
+  dirs = []
+  for dirpath, dirnames, _ in os.walk(root):
+    dirnames[:] = sorted(d for d in dirnames if d not in DEFAULT_EXCLUDES)
+    dirs.append(dirpath)
+  return dirs
+
 def generate_index_files(root, git_root="/", parent=None, template=None, template_path="index_tpl.html", missing_alts={}):
   indexed = []
   is_root = False
@@ -128,13 +152,7 @@ def generate_index_files(root, git_root="/", parent=None, template=None, templat
 
   if not template:
     is_root = True
-    if template_path.startswith("http"):
-      tpl = requests.get(template_path).text # eg. https://cdn.astrolab.fi/libs/index_tpl.html
-    else:
-      template_path = (Path(__file__).parent / template_path) if not template_path.startswith("/") else template_path
-      with open(template_path, "r") as f:
-        tpl = f.read()
-    template = Template(tpl)
+    template = load_template(template_path)
 
   indexed.append(create_index_html(root=root, git_root=git_root, parent=parent, template=template, missing_alts=missing_alts))
 